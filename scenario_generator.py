@@ -24,6 +24,7 @@ from vrptw.scenario_config import (
 from vrptw.scenario_storage import (
     calculate_pharmacy_distances,
     collect_route_geometries,
+    collect_route_stops,
     get_scenario_summary_stats,
     initialize_scenario_data_directory,
     load_completed_scenarios,
@@ -34,15 +35,22 @@ from vrptw.scenario_storage import (
 
 
 def run_single_scenario(
-    scenario, base_config: VRPConfig, output_dir: Path, all_pharmacies_df
+    scenario,
+    base_config: VRPConfig,
+    output_dir: Path,
+    all_pharmacies_df,
+    store_geometries: bool = True,
 ) -> tuple[bool, float]:
     """Run optimization for a single scenario.
 
+    Checkpointing is left to the caller, so completed.txt has a single writer.
+
     Args:
         scenario: ScenarioParams for this scenario
         base_config: Base VRP configuration
         output_dir: Output directory for results
         all_pharmacies_df: Polars DataFrame with all pharmacy data
+        store_geometries: Whether to fetch and store OSRM route geometries
 
     Returns:
         Tuple of (success, execution_time_sec)
@@ -69,8 +77,12 @@ def run_single_scenario(
         # Run VRP optimization with pre-filtered pharmacies
         result = run_vrp(config, pharmacies_override=pharmacies_list)
 
-        # Collect route geometries for offline use
-        route_geometries = collect_route_geometries(result, config.osrm_url)
+        # Collect route geometries for offline use (stops only for summary-only runs)
+        route_geometries = (
+            collect_route_geometries(result, config.osrm_url)
+            if store_geometries
+            else collect_route_stops(result)
+        )
 
         # Store results
         execution_time = time.time() - start_time
@@ -83,9 +95,6 @@ def run_single_scenario(
             output_dir=output_dir,
         )
 
-        # Mark as completed
-        mark_scenario_completed(scenario.scenario_id, output_dir)
-
         return True, execution_time
 
     except Exception as e:
@@ -114,6 +123,11 @@ def main():
     parser.add_argument(
         "--max-radius", type=int, default=75, help="Maximum radius for scenarios (default: 75km)"
     )
+    parser.add_argument(
+        "--skip-geometries",
+        action="store_true",
+        help="Store only route stops, without fetching OSRM route geometries",
+    )
 
     args = parser.parse_args()
     output_dir = Path(args.output_dir)
@@ -222,10 +236,13 @@ def main():
                 base_config=base_config,
                 output_dir=output_dir,
                 all_pharmacies_df=all_pharmacies_df,
+                store_geometries=not args.skip_geometries,
             )
 
             if success:
                 successful_count += 1
+                # Checkpoint from the driver rather than inside the scenario run
+                mark_scenario_completed(scenario.scenario_id, output_dir)
             else:
                 failed_count += 1
 
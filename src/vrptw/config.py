@@ -3,9 +3,12 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True)
 class VRPConfig:
-    """Configuration class for VRPTW solver parameters."""
+    """Configuration class for VRPTW solver parameters.
+
+    Instances are immutable; derive variants with dataclasses.replace.
+    """
 
     # Geography / data collection - Würzburg-Heuchelhof (Getränke Fritze depot)
     center_lat: float = 49.7571
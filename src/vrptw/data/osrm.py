@@ -1,8 +1,13 @@
 """OSRM integration for distance matrices and route geometry."""
 
+from functools import lru_cache
+
 import pandas as pd
 import requests
 
+# Decimal places kept for coordinates in cache keys and map output (OSRM's native precision, ~1.1 m)
+COORD_PRECISION = 5
+
 
 def get_distance_matrix_osrm(
     depot_lat: float,
@@ -80,6 +85,34 @@ def get_distance_matrix_osrm(
         raise ValueError(f"Failed to parse OSRM response: {e}") from e
 
 
+@lru_cache(maxsize=4096)
+def _fetch_route_geometry(
+    osrm_url: str, lat1: float, lon1: float, lat2: float, lon2: float
+) -> tuple[tuple[float, float], ...]:
+    """Fetch route geometry between two points from OSRM (memoized).
+
+    Raises:
+        requests.RequestException: If OSRM request fails
+        ValueError: If OSRM returns no route
+    """
+    route_url = f"{osrm_url}/route/v1/driving/{lon1},{lat1};{lon2},{lat2}"
+    params = {"overview": "full", "geometries": "geojson"}
+
+    response = requests.get(route_url, params=params, timeout=10)
+    response.raise_for_status()
+
+    data = response.json()
+
+    if data.get("code") == "Ok" and "routes" in data and data["routes"]:
+        route = data["routes"][0]
+        if "geometry" in route and "coordinates" in route["geometry"]:
+            # OSRM returns [lon, lat] coordinates, convert to [lat, lon]
+            coords = route["geometry"]["coordinates"]
+            return tuple((lat, lon) for lon, lat in coords)
+
+    raise ValueError(f"OSRM returned no route: {data.get('message', data.get('code'))}")
+
+
 def get_route_geometry(
     osrm_url: str, lat1: float, lon1: float, lat2: float, lon2: float
 ) -> list[tuple[float, float]]:
@@ -96,27 +129,101 @@ def get_route_geometry(
         List of (lat, lon) coordinate tuples representing the route
 
     Note:
+        Successful lookups are cached per coordinate pair (rounded to 5 decimals), so
+        segments shared by several routes or scenarios hit OSRM only once.
         Falls back to direct line if OSRM routing fails
     """
-    route_url = f"{osrm_url}/route/v1/driving/{lon1},{lat1};{lon2},{lat2}"
-    params = {"overview": "full", "geometries": "geojson"}
+    try:
+        return list(
+            _fetch_route_geometry(
+                osrm_url,
+                round(lat1, COORD_PRECISION),
+                round(lon1, COORD_PRECISION),
+                round(lat2, COORD_PRECISION),
+                round(lon2, COORD_PRECISION),
+            )
+        )
+    except (requests.RequestException, KeyError, IndexError, ValueError):
+        # Fall back to direct line if routing fails
+        pass
+
+    # Fallback: direct line between points
+    return [(lat1, lon1), (lat2, lon2)]
+
+
+def _decode_polyline(encoded: str, precision: int = 5) -> list[tuple[float, float]]:
+    """Decode an encoded polyline string into coordinates.
+
+    Args:
+        encoded: Encoded polyline as returned by OSRM with geometries=polyline
+        precision: Decimal places of the encoding (5 for polyline, 6 for polyline6)
+
+    Returns:
+        List of (lat, lon) coordinate tuples
+    """
+    factor = 10**precision
+    coords = []
+    index = lat = lon = 0
+    while index < len(encoded):
+        # Each point is a (lat, lon) pair of zigzag-encoded deltas in 5-bit chunks
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                chunk = ord(encoded[index]) - 63
+                index += 1
+                result |= (chunk & 0x1F) << shift
+                shift += 5
+                if chunk < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coords.append((lat / factor, lon / factor))
+    return coords
+
+
+def get_route_geometry_multi(
+    osrm_url: str,
+    waypoints: list[tuple[float, float]],
+    overview: str = "simplified",
+    timeout: int = 30,
+) -> list[tuple[float, float]]:
+    """Get the geometry of a whole multi-stop route with a single OSRM request.
+
+    Args:
+        osrm_url: OSRM server URL
+        waypoints: List of (lat, lon) tuples in visiting order
+        overview: OSRM overview level, "simplified" (zoom-appropriate) or "full"
+        timeout: Request timeout in seconds
+
+    Returns:
+        List of (lat, lon) coordinate tuples along the route, at 5-decimal precision
+
+    Note:
+        Falls back to direct lines between waypoints if OSRM routing fails
+    """
+    coord_string = ";".join(f"{lon},{lat}" for lat, lon in waypoints)
+    route_url = f"{osrm_url}/route/v1/driving/{coord_string}"
+    params = {
+        "overview": overview,
+        "geometries": "polyline",
+        "steps": "false",
+        "annotations": "false",
+    }
 
     try:
-        response = requests.get(route_url, params=params, timeout=10)
+        response = requests.get(route_url, params=params, timeout=timeout)
         response.raise_for_status()
 
         data = response.json()
 
         if data.get("code") == "Ok" and "routes" in data and data["routes"]:
-            route = data["routes"][0]
-            if "geometry" in route and "coordinates" in route["geometry"]:
-                # OSRM returns [lon, lat] coordinates, convert to [lat, lon]
-                coords = route["geometry"]["coordinates"]
-                return [(lat, lon) for lon, lat in coords]
+            return _decode_polyline(data["routes"][0]["geometry"])
 
-    except (requests.RequestException, KeyError, IndexError):
-        # Fall back to direct line if routing fails
+    except (requests.RequestException, KeyError, IndexError, TypeError):
+        # Fall back to direct lines if routing fails
         pass
 
-    # Fallback: direct line between points
-    return [(lat1, lon1), (lat2, lon2)]
+    # Fallback: direct lines through all waypoints, rounded like the decoded polyline
+    return [(round(lat, COORD_PRECISION), round(lon, COORD_PRECISION)) for lat, lon in waypoints]
@@ -1,6 +1,7 @@
 """Main execution logic for VRPTW solver."""
 
 import time
+from dataclasses import fields
 from typing import Any
 
 from .config import VRPConfig
@@ -149,16 +150,16 @@ def main_with_custom_config(**kwargs: Any) -> VRPResult:
             vehicle_capacity=40
         )
     """
-    config = VRPConfig()
-
-    # Override config with provided kwargs
+    # Override config defaults with provided kwargs
+    known_fields = {f.name for f in fields(VRPConfig)}
+    overrides = {}
     for key, value in kwargs.items():
-        if hasattr(config, key):
-            setattr(config, key, value)
+        if key in known_fields:
+            overrides[key] = value
         else:
             print(f"WARNING: Unknown config parameter: {key}")
 
-    return main(config)
+    return main(VRPConfig(**overrides))
 
 
 def quick_test() -> VRPResult:
@@ -1,12 +1,14 @@
 """Configuration and parameter generation for VRPTW scenarios."""
 
 import itertools
+from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 
 from .config import VRPConfig
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ScenarioParams:
     """Parameters for a single VRPTW scenario."""
 
@@ -31,15 +33,17 @@ def generate_scenario_id(radius_km: float, client_tw_hours: int, service_time_se
     Returns:
         Scenario ID in format 'RR_HH_SS' (e.g., '05_02_01', '75_10_09')
     """
-    service_time_min = service_time_sec // 60
-    return f"{int(radius_km):02d}_{client_tw_hours:02d}_{service_time_min:02d}"
+    return f"{int(radius_km):02d}_{client_tw_hours:02d}_{service_time_sec // 60:02d}"
 
 
-def generate_all_scenarios() -> list[ScenarioParams]:
+@lru_cache(maxsize=1)
+def generate_all_scenarios() -> tuple[ScenarioParams, ...]:
     """Generate all 1350 scenario parameter combinations.
 
+    The result is memoized, so the parameter product is only built once per process.
+
     Returns:
-        List of ScenarioParams for all radius/time window/service time combinations
+        Tuple of ScenarioParams for all radius/time window/service time combinations
     """
     # Search radii: 5-75km in 5km steps (15 values)
     radii = list(range(5, 80, 5))
@@ -55,32 +59,32 @@ def generate_all_scenarios() -> list[ScenarioParams]:
     depot_tw_start = 5 * 3600  # 05:00 in seconds
     depot_tw_end = 19 * 3600  # 19:00 in seconds
 
-    scenarios = []
-    for radius, tw_hours, service_time in itertools.product(radii, tw_lengths, service_times_sec):
-        client_tw_end = client_tw_start + (tw_hours * 3600)
-        scenario_id = generate_scenario_id(radius, tw_hours, service_time)
-
-        scenarios.append(
-            ScenarioParams(
-                scenario_id=scenario_id,
-                radius_km=radius,
-                client_tw_hours=tw_hours,
-                client_tw_start=client_tw_start,
-                client_tw_end=client_tw_end,
-                depot_tw_start=depot_tw_start,
-                depot_tw_end=depot_tw_end,
-                service_time_sec=service_time,
-            )
+    return tuple(
+        ScenarioParams(
+            scenario_id=generate_scenario_id(radius, tw_hours, service_time),
+            radius_km=radius,
+            client_tw_hours=tw_hours,
+            client_tw_start=client_tw_start,
+            client_tw_end=client_tw_start + (tw_hours * 3600),
+            depot_tw_start=depot_tw_start,
+            depot_tw_end=depot_tw_end,
+            service_time_sec=service_time,
         )
-
-    return scenarios
+        for radius, tw_hours, service_time in itertools.product(
+            radii, tw_lengths, service_times_sec
+        )
+    )
 
 
+@lru_cache(maxsize=256)
 def create_vrp_config_for_scenario(
     scenario: ScenarioParams, base_config: VRPConfig | None = None
 ) -> VRPConfig:
     """Create VRPConfig for a specific scenario.
 
+    Both arguments are frozen dataclasses, so results are memoized per
+    (scenario, base_config) and the returned config can be shared safely.
+
     Args:
         scenario: Scenario parameters
         base_config: Base configuration to modify (uses default if None)
@@ -159,6 +163,22 @@ Expected Runtime: 5-20 hours ({len(scenarios)} scenarios)
     return summary
 
 
+@lru_cache(maxsize=2)
+def _index_scenarios(field: str) -> dict[float, tuple[ScenarioParams, ...]]:
+    """Group the cached scenarios by the value of one field, preserving order.
+
+    Args:
+        field: ScenarioParams attribute to group by
+
+    Returns:
+        Dictionary mapping each field value to its scenarios
+    """
+    index: dict[float, list[ScenarioParams]] = defaultdict(list)
+    for scenario in generate_all_scenarios():
+        index[getattr(scenario, field)].append(scenario)
+    return {value: tuple(scenarios) for value, scenarios in index.items()}
+
+
 def get_scenarios_by_radius(radius_km: float) -> list[ScenarioParams]:
     """Get all scenarios for a specific radius.
 
@@ -168,8 +188,7 @@ def get_scenarios_by_radius(radius_km: float) -> list[ScenarioParams]:
     Returns:
         List of scenarios matching the radius
     """
-    all_scenarios = generate_all_scenarios()
-    return [s for s in all_scenarios if s.radius_km == radius_km]
+    return list(_index_scenarios("radius_km").get(radius_km, ()))
 
 
 def get_scenarios_by_time_window(tw_hours: int) -> list[ScenarioParams]:
@@ -181,5 +200,4 @@ def get_scenarios_by_time_window(tw_hours: int) -> list[ScenarioParams]:
     Returns:
         List of scenarios matching the time window length
     """
-    all_scenarios = generate_all_scenarios()
-    return [s for s in all_scenarios if s.client_tw_hours == tw_hours]
+    return list(_index_scenarios("client_tw_hours").get(tw_hours, ()))
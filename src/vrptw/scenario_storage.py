@@ -1,25 +1,57 @@
 """Data storage utilities for VRPTW scenarios using Polars."""
 
 import json
-import math
+from collections.abc import Iterable
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Protocol
 
 import polars as pl
 
 from .data.osrm import get_route_geometry
 from .scenario_config import ScenarioParams
 from .solver import VRPResult
+from .utils import haversine_km
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Returned (as a clone) when no pharmacies were found, avoiding a schema rebuild per call
+_EMPTY_PHARMACIES_DF = pl.DataFrame(
+    schema={
+        "id": pl.Utf8,
+        "name": pl.Utf8,
+        "lat": pl.Float64,
+        "lon": pl.Float64,
+        "distance_from_center_km": pl.Float64,
+    }
+)
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    """Write data as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        path.write_bytes(
+            orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
 
 
 def calculate_pharmacy_distances(
-    pharmacies: list[dict[str, str | float]], center_lat: float, center_lon: float
+    pharmacies: list[dict[str, str | float]] | pl.DataFrame,
+    center_lat: float,
+    center_lon: float,
 ) -> pl.DataFrame:
     """Convert pharmacy list to Polars DataFrame with distance calculations.
 
     Args:
-        pharmacies: List of pharmacy dictionaries from Overpass
+        pharmacies: List of pharmacy dictionaries from Overpass, or a DataFrame with
+            the same columns
         center_lat: Depot latitude for distance calculation
         center_lon: Depot longitude for distance calculation
 
@@ -27,51 +59,15 @@ def calculate_pharmacy_distances(
         Polars DataFrame with pharmacy data and distance_from_center_km column
     """
     # Handle empty case
-    if not pharmacies:
-        return pl.DataFrame(
-            schema={
-                "id": pl.Utf8,
-                "name": pl.Utf8,
-                "lat": pl.Float64,
-                "lon": pl.Float64,
-                "distance_from_center_km": pl.Float64,
-            }
-        )
-
-    # Convert to Polars DataFrame
-    df = pl.DataFrame(pharmacies)
+    if len(pharmacies) == 0:
+        return _EMPTY_PHARMACIES_DF.clone()
 
-    # Calculate distances using haversine formula
-    def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Calculate great circle distance between two points in km."""
-        R = 6371  # Earth's radius in km
+    # Convert to Polars DataFrame (columnar input is used as-is)
+    df = pharmacies if isinstance(pharmacies, pl.DataFrame) else pl.DataFrame(pharmacies)
 
-        # Convert degrees to radians
-        lat1_rad, lon1_rad = math.radians(lat1), math.radians(lon1)
-        lat2_rad, lon2_rad = math.radians(lat2), math.radians(lon2)
-
-        # Haversine formula
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
-        a = (
-            math.sin(dlat / 2) ** 2
-            + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-        return R * c
-
-    # Add distance column
-    df = df.with_columns(
-        [
-            pl.struct(["lat", "lon"])
-            .map_elements(
-                lambda row: haversine_distance(center_lat, center_lon, row["lat"], row["lon"]),
-                return_dtype=pl.Float64,
-            )
-            .alias("distance_from_center_km")
-        ]
-    )
+    # Vectorized haversine distance from the depot over the whole coordinate columns
+    distances = haversine_km(center_lat, center_lon, df["lat"].to_numpy(), df["lon"].to_numpy())
+    df = df.with_columns(pl.Series("distance_from_center_km", distances, dtype=pl.Float64))
 
     return df
 
@@ -135,8 +131,30 @@ def collect_route_geometries(
 
         routes_with_geometry.append(route_data)
 
+    return _solution_data(result, routes_with_geometry)
+
+
+def collect_route_stops(result: VRPResult) -> dict[str, Any]:
+    """Collect route data without OSRM geometries (stop sequence only).
+
+    Args:
+        result: VRP solution result
+
+    Returns:
+        Dictionary with the same layout as collect_route_geometries, minus segments
+    """
+    routes = [
+        {"vehicle": route["vehicle"], "load": route["load"], "stops": route["stops"]}
+        for route in result.routes
+        if len(route["stops"]) >= 2
+    ]
+    return _solution_data(result, routes)
+
+
+def _solution_data(result: VRPResult, routes: list[dict[str, Any]]) -> dict[str, Any]:
+    """Wrap per-route data with the solution totals stored in route files."""
     return {
-        "routes": routes_with_geometry,
+        "routes": routes,
         "total_distance_km": result.total_distance_km,
         "total_time_sec": result.total_time_sec,
         "vehicles_used": result.vehicles_used,
@@ -176,20 +194,23 @@ def initialize_scenario_data_directory(output_dir: Path) -> None:
         },
     }
 
-    with open(output_dir / "metadata.json", "w") as f:
-        json.dump(metadata, f, indent=2)
+    _write_json(output_dir / "metadata.json", metadata)
 
 
-def store_pharmacies_data(df_pharmacies: pl.DataFrame, output_dir: Path) -> None:
+def store_pharmacies_data(df_pharmacies: pl.DataFrame, output_dir: Path) -> Path:
     """Store venue data as Parquet file.
 
     Args:
         df_pharmacies: Polars DataFrame with venue data
         output_dir: Output directory
+
+    Returns:
+        Path of the written Parquet file
     """
     output_path = output_dir / "venues.parquet"
     df_pharmacies.write_parquet(output_path)
     print(f"Stored venue data: {output_path} ({len(df_pharmacies)} venues)")
+    return output_path
 
 
 def store_scenario_result(
@@ -205,7 +226,7 @@ def store_scenario_result(
     Args:
         scenario: Scenario parameters
         result: VRP solution result
-        route_geometries: Route data with geometries
+        route_geometries: Route data from collect_route_geometries or collect_route_stops
         pharmacies_count: Number of pharmacies in this scenario
         execution_time_sec: Execution time for this scenario
         output_dir: Output directory
@@ -231,8 +252,7 @@ def store_scenario_result(
     }
 
     route_file = output_dir / "routes" / f"scenario_{scenario.scenario_id}.json"
-    with open(route_file, "w") as f:
-        json.dump(route_data, f, indent=2)
+    _write_json(route_file, route_data)
 
     # Append scenario summary to CSV
     scenario_data = {
@@ -270,33 +290,126 @@ def store_scenario_result(
     )
 
 
-def load_completed_scenarios(output_dir: Path) -> set[str]:
+class CompletedStore(Protocol):
+    """Backend that records which scenarios have completed, per output directory."""
+
+    def load(self, output_dir: Path) -> set[str]:
+        """Return the completed scenario IDs recorded for output_dir."""
+        ...
+
+    def append(self, scenario_ids: Iterable[str], output_dir: Path) -> None:
+        """Record scenario IDs as completed."""
+        ...
+
+
+class FileCompletedStore:
+    """Completed scenario IDs kept as one line each in output_dir/completed.txt."""
+
+    def load(self, output_dir: Path) -> set[str]:
+        """Return the completed scenario IDs recorded for output_dir."""
+        completed_file = output_dir / "completed.txt"
+        if not completed_file.exists():
+            return set()
+
+        lines = completed_file.read_text().splitlines()
+        return {line.strip() for line in lines if line.strip()}
+
+    def append(self, scenario_ids: Iterable[str], output_dir: Path) -> None:
+        """Record scenario IDs as completed with a single append."""
+        lines = "".join(f"{scenario_id}\n" for scenario_id in scenario_ids)
+        if not lines:
+            return
+
+        with open(output_dir / "completed.txt", "a") as f:
+            f.write(lines)
+
+
+class InMemoryCompletedStore:
+    """Completed scenario IDs kept in memory per output directory (no disk access)."""
+
+    def __init__(self) -> None:
+        self._completed: dict[Path, set[str]] = {}
+
+    def load(self, output_dir: Path) -> set[str]:
+        """Return the completed scenario IDs recorded for output_dir."""
+        return set(self._completed.get(output_dir, ()))
+
+    def append(self, scenario_ids: Iterable[str], output_dir: Path) -> None:
+        """Record scenario IDs as completed."""
+        self._completed.setdefault(output_dir, set()).update(scenario_ids)
+
+
+_FILE_COMPLETED_STORE = FileCompletedStore()
+
+
+def load_completed_scenarios(
+    output_dir: Path, store: CompletedStore = _FILE_COMPLETED_STORE
+) -> set[str]:
     """Load set of completed scenario IDs for resumability.
 
     Args:
         output_dir: Output directory
+        store: Checkpoint backend (defaults to completed.txt in output_dir)
 
     Returns:
         Set of completed scenario IDs
     """
-    completed_file = output_dir / "completed.txt"
-    if not completed_file.exists():
-        return set()
+    return store.load(output_dir)
+
+
+@lru_cache(maxsize=16)
+def _load_completed_file(output_dir: Path, mtime_ns: int, size: int) -> frozenset[str]:
+    """Read completed.txt once per (mtime_ns, size) state of the file."""
+    return frozenset(_FILE_COMPLETED_STORE.load(output_dir))
+
 
-    with open(completed_file) as f:
-        return set(line.strip() for line in f if line.strip())
+def load_completed_scenarios_cached(output_dir: Path) -> frozenset[str]:
+    """Load completed scenario IDs from completed.txt, re-reading only when it changed.
 
+    The file is append-only, so any new entry changes its size (and mtime) and
+    invalidates the cached result.
 
-def mark_scenario_completed(scenario_id: str, output_dir: Path) -> None:
+    Args:
+        output_dir: Output directory
+
+    Returns:
+        Frozen set of completed scenario IDs
+    """
+    try:
+        stat = (output_dir / "completed.txt").stat()
+    except FileNotFoundError:
+        return frozenset()
+    return _load_completed_file(output_dir, stat.st_mtime_ns, stat.st_size)
+
+
+def mark_scenario_completed(
+    scenario_id: str,
+    output_dir: Path,
+    store: CompletedStore = _FILE_COMPLETED_STORE,
+) -> None:
     """Mark a scenario as completed for resumability.
 
     Args:
         scenario_id: ID of completed scenario
         output_dir: Output directory
+        store: Checkpoint backend (defaults to completed.txt in output_dir)
+    """
+    store.append((scenario_id,), output_dir)
+
+
+def mark_scenarios_completed(
+    scenario_ids: Iterable[str],
+    output_dir: Path,
+    store: CompletedStore = _FILE_COMPLETED_STORE,
+) -> None:
+    """Mark several scenarios as completed with a single append.
+
+    Args:
+        scenario_ids: IDs of completed scenarios
+        output_dir: Output directory
+        store: Checkpoint backend (defaults to completed.txt in output_dir)
     """
-    completed_file = output_dir / "completed.txt"
-    with open(completed_file, "a") as f:
-        f.write(f"{scenario_id}\n")
+    store.append(scenario_ids, output_dir)
 
 
 def get_scenario_summary_stats(output_dir: Path) -> dict[str, Any]:
@@ -312,8 +425,18 @@ def get_scenario_summary_stats(output_dir: Path) -> dict[str, Any]:
     if not scenarios_file.exists():
         return {"message": "No scenarios completed yet"}
 
-    df = pl.read_csv(scenarios_file)
+    return get_scenario_summary_stats_from_df(pl.read_csv(scenarios_file))
+
+
+def get_scenario_summary_stats_from_df(df: pl.DataFrame) -> dict[str, Any]:
+    """Get summary statistics from a DataFrame of scenario results.
+
+    Args:
+        df: Scenario results with the columns written to scenarios.csv
 
+    Returns:
+        Dictionary with summary statistics
+    """
     stats = {
         "total_scenarios": len(df),
         "successful_scenarios": len(df.filter(pl.col("status") == "OK")),
@@ -3,6 +3,7 @@
 from dataclasses import dataclass
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from .data import get_distance_matrix_osrm, get_pharmacies_overpass
@@ -31,6 +32,29 @@ def _require_ortools():
         raise ImportError("OR-Tools not available. Install with: uv add ortools")
 
 
+def _route_totals(
+    nodes: np.ndarray,
+    distance_matrix: np.ndarray,
+    time_matrix: np.ndarray,
+    service_times: np.ndarray,
+) -> tuple[float, int]:
+    """Sum distance and travel+service time over consecutive nodes of one route.
+
+    Args:
+        nodes: Node indices in visiting order
+        distance_matrix: Distance matrix in km
+        time_matrix: Integer travel time matrix in seconds
+        service_times: Service time per node in seconds
+
+    Returns:
+        Tuple of (distance_km, time_sec)
+    """
+    from_nodes, to_nodes = nodes[:-1], nodes[1:]
+    distance = distance_matrix[from_nodes, to_nodes].sum()
+    time = (time_matrix[from_nodes, to_nodes] + service_times[from_nodes]).sum()
+    return float(distance), int(time)
+
+
 def prepare_matrices(
     depot_lat: float,
     depot_lon: float,
@@ -106,18 +130,24 @@ def solve_vrptw(
     distance_matrix = dist_df.values  # km, float
 
     # Convert to int seconds (round) to satisfy OR-Tools integer requirement
-    time_matrix_int = [[int(round(v)) for v in row] for row in time_matrix]
+    time_matrix_np = np.rint(time_matrix).astype(np.int64)
+    time_matrix_int = time_matrix_np.tolist()  # nested lists for the transit callback
 
     # Demands: 0 at depot, 1 per pharmacy
-    demands = [0] + [1] * n_clients
-    service_times = [0] + [service_time_sec] * n_clients
+    demand_arr = np.ones(n_clients + 1, dtype=np.int32)
+    demand_arr[0] = 0
+    service_times_np = np.full(n_clients + 1, service_time_sec, dtype=np.int64)
+    service_times_np[0] = 0
+    service_times = service_times_np.tolist()
 
     # Time windows: depot can have its own window; clients share client_tw
     if depot_tw is None:
         depot_tw = client_tw
     depot_start, depot_end = depot_tw
     client_start, client_end = client_tw
-    time_windows = [depot_tw] + [(client_start, client_end)] * n_clients
+    tw_start = np.full(n_clients + 1, client_start, dtype=np.int64)
+    tw_end = np.full(n_clients + 1, client_end, dtype=np.int64)
+    tw_start[0], tw_end[0] = depot_tw
 
     # If vehicle_count unspecified, heuristic lower bound via total service time / window span
     if vehicle_count is None:
@@ -138,11 +168,8 @@ def solve_vrptw(
         transit_idx = routing_loc.RegisterTransitCallback(time_callback)
         routing_loc.SetArcCostEvaluatorOfAllVehicles(transit_idx)
 
-        def demand_callback(from_index: int) -> int:
-            node = manager_loc.IndexToNode(from_index)
-            return demands[node]
-
-        demand_idx = routing_loc.RegisterUnaryTransitCallback(demand_callback)
+        # Per-node demands are constant, so hand them to OR-Tools as a vector
+        demand_idx = routing_loc.RegisterUnaryTransitVector(demand_arr.tolist())
         routing_loc.AddDimensionWithVehicleCapacity(
             demand_idx, 0, [vehicle_capacity] * v_count, True, "Capacity"
         )
@@ -157,9 +184,9 @@ def solve_vrptw(
         )
 
         time_dim_loc = routing_loc.GetDimensionOrDie("Time")
-        for node, (start, end) in enumerate(time_windows):
+        for node in range(len(tw_start)):
             index = manager_loc.NodeToIndex(node)
-            time_dim_loc.CumulVar(index).SetRange(start, end)
+            time_dim_loc.CumulVar(index).SetRange(int(tw_start[node]), int(tw_end[node]))
 
         for v in range(v_count):
             start_index = routing_loc.Start(v)
@@ -199,6 +226,11 @@ def solve_vrptw(
     assert routing is not None and manager is not None
     time_dimension = routing.GetDimensionOrDie("Time")
 
+    # Node attribute lookups (index 0 = depot) so stop records need no branching
+    names = ["DEPOT", *[p["name"] for p in pharmacies]]
+    lats = [depot_lat, *[p["lat"] for p in pharmacies]]
+    lons = [depot_lon, *[p["lon"] for p in pharmacies]]
+
     routes: list[dict[str, Any]] = []
     total_distance_km = 0.0
     total_time_sec = 0
@@ -210,31 +242,34 @@ def solve_vrptw(
             continue  # unused vehicle
 
         vehicles_used += 1
-        route_nodes = []
-        route_load = 0
+        nodes: list[int] = []
+        arrival_times: list[int] = []
 
         while not routing.IsEnd(index):
-            node = manager.IndexToNode(index)
-            t_cumul = solution.Value(time_dimension.CumulVar(index))
-            route_nodes.append(
-                {
-                    "node": node,
-                    "is_depot": node == 0,
-                    "arrival_time": t_cumul,
-                    "name": "DEPOT" if node == 0 else pharmacies[node - 1]["name"],
-                    "lat": depot_lat if node == 0 else pharmacies[node - 1]["lat"],
-                    "lon": depot_lon if node == 0 else pharmacies[node - 1]["lon"],
-                }
-            )
-            route_load += demands[node]
-            prev_index = index
+            nodes.append(manager.IndexToNode(index))
+            arrival_times.append(solution.Value(time_dimension.CumulVar(index)))
             index = solution.Value(routing.NextVar(index))
 
-            if not routing.IsEnd(index):
-                from_node = manager.IndexToNode(prev_index)
-                to_node = manager.IndexToNode(index)
-                total_distance_km += distance_matrix[from_node][to_node]
-                total_time_sec += time_matrix_int[from_node][to_node] + service_times[from_node]
+        # Accumulate totals with one gather per route (return arc to the depot is not counted)
+        arr = np.asarray(nodes)
+        route_distance, route_time = _route_totals(
+            arr, distance_matrix, time_matrix_np, service_times_np
+        )
+        total_distance_km += route_distance
+        total_time_sec += route_time
+
+        route_nodes = [
+            {
+                "node": node,
+                "is_depot": node == 0,
+                "arrival_time": t_cumul,
+                "name": names[node],
+                "lat": lats[node],
+                "lon": lons[node],
+            }
+            for node, t_cumul in zip(nodes, arrival_times, strict=True)
+        ]
+        route_load = int(demand_arr[arr].sum())
 
         # add depot end
         node = manager.IndexToNode(index)
@@ -1,5 +1,7 @@
 """Utility functions for VRPTW solver."""
 
+import numpy as np
+
 from .solver import VRPResult
 
 
@@ -10,6 +12,56 @@ def _fmt_time(seconds: int) -> str:
     return f"{h:02d}:{m:02d}"
 
 
+def haversine_km(
+    lat1: float, lon1: float, lats: np.ndarray | list[float], lons: np.ndarray | list[float]
+) -> np.ndarray:
+    """Calculate great circle distances from one point to many points.
+
+    Args:
+        lat1: Origin latitude
+        lon1: Origin longitude
+        lats: Destination latitudes
+        lons: Destination longitudes
+
+    Returns:
+        Array of distances in km, one per destination
+    """
+    R = 6371  # Earth's radius in km
+
+    lat1_rad, lon1_rad = np.radians(lat1), np.radians(lon1)
+    lats_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    lons_rad = np.radians(np.asarray(lons, dtype=np.float64))
+
+    a = (
+        np.sin((lats_rad - lat1_rad) / 2) ** 2
+        + np.cos(lat1_rad) * np.cos(lats_rad) * np.sin((lons_rad - lon1_rad) / 2) ** 2
+    )
+    return R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def routes_to_soa(routes: list[dict]) -> dict[int, dict[str, np.ndarray]]:
+    """Convert route stop dicts into per-route NumPy arrays.
+
+    Args:
+        routes: Routes as stored in VRPResult.routes
+
+    Returns:
+        Dict mapping route index to arrays 'lat', 'lon', 'arrival' and 'is_depot',
+        each with one entry per stop in visiting order
+    """
+    soa = {}
+    for i, route in enumerate(routes):
+        stops = route["stops"]
+        n = len(stops)
+        soa[i] = {
+            "lat": np.fromiter((s["lat"] for s in stops), dtype=np.float64, count=n),
+            "lon": np.fromiter((s["lon"] for s in stops), dtype=np.float64, count=n),
+            "arrival": np.fromiter((s["arrival_time"] for s in stops), dtype=np.int64, count=n),
+            "is_depot": np.fromiter((s["is_depot"] for s in stops), dtype=bool, count=n),
+        }
+    return soa
+
+
 def summarize_result(result: VRPResult) -> None:
     """Print a summary of the VRPTW solution.
 
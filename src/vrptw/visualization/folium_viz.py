@@ -1,12 +1,27 @@
 """Folium-based interactive visualization for VRPTW solutions."""
 
-import colorsys
+import gzip
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-import folium
-from folium import plugins
+import numpy as np
 
-from ..data.osrm import get_route_geometry
+from ..data.osrm import COORD_PRECISION
 from ..solver import VRPResult
+from ..utils import haversine_km, routes_to_soa
+
+if TYPE_CHECKING:
+    import folium
+
+# Concurrent OSRM route requests issued while building a map
+_OSRM_MAX_WORKERS = 8
+
+# Pharmacy marker styling shared by every stop (medical cross symbol)
+_PHARMACY_ICON_KWARGS = {"color": "blue", "icon": "plus-square", "prefix": "fa"}
+_PHARMACY_POPUP_TEMPLATE = (
+    "<b>💊 {name}</b><br/>Vehicle: {vehicle}<br/>Stop: {stop}<br/>Arrival: {arrival}"
+)
 
 
 def generate_colors(n: int) -> list[str]:
@@ -23,17 +38,38 @@ def generate_colors(n: int) -> list[str]:
     if n == 1:
         return ["#1f77b4"]
 
-    colors = []
-    for i in range(n):
-        hue = i / n  # Distribute hues evenly around color wheel
-        saturation = 0.8 + (i % 3) * 0.1  # Vary saturation slightly (0.8-1.0)
-        value = 0.9 + (i % 2) * 0.1  # Vary brightness slightly (0.9-1.0)
+    # Deferred so importing the module does not pay for matplotlib
+    from matplotlib.colors import hsv_to_rgb
+
+    i = np.arange(n)
+    hue = i / n  # Distribute hues evenly around color wheel
+    saturation = 0.8 + (i % 3) * 0.1  # Vary saturation slightly (0.8-1.0)
+    value = 0.9 + (i % 2) * 0.1  # Vary brightness slightly (0.9-1.0)
+
+    rgb = hsv_to_rgb(np.stack([hue, saturation, value], axis=1))
+    rgb_bytes = (rgb * 255).astype(np.uint8)
+    return ["#" + row.tobytes().hex() for row in rgb_bytes]
+
+
+def _save_map(m: "folium.Map", output_path: str, gzip_output: bool = False) -> None:
+    """Save a folium map as HTML with line-break indentation between tags collapsed.
 
-        rgb = colorsys.hsv_to_rgb(hue, saturation, value)
-        hex_color = f"#{int(rgb[0] * 255):02x}{int(rgb[1] * 255):02x}{int(rgb[2] * 255):02x}"
-        colors.append(hex_color)
+    Whitespace without a newline is kept, since it can be a visible space between
+    inline elements (e.g. ``<b>Status:</b> <span>``).
 
-    return colors
+    Args:
+        m: Folium map to save
+        output_path: Path to save the HTML map
+        gzip_output: Also write a gzip-compressed copy to output_path + ".gz"
+    """
+    html = re.sub(r">\s*\n\s*<", "><", m.get_root().render())
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+    if gzip_output:
+        with gzip.open(f"{output_path}.gz", "wt", encoding="utf-8") as f:
+            f.write(html)
 
 
 def build_folium_map(
@@ -42,6 +78,7 @@ def build_folium_map(
     depot_lon: float,
     osrm_url: str = "http://127.0.0.1:9001",
     output_path: str = "vrp_routes.html",
+    gzip_output: bool = False,
 ) -> None:
     """Build interactive Folium map of VRPTW solution.
 
@@ -51,11 +88,18 @@ def build_folium_map(
         depot_lon: Depot longitude
         osrm_url: OSRM server URL for route geometry
         output_path: Path to save the HTML map
+        gzip_output: Also write a gzip-compressed copy of the HTML map
     """
     if result.status != "OK" or not result.routes:
         print(f"No solution to map (status: {result.status})")
         return
 
+    # Deferred so importing the package does not pay for folium
+    import folium
+    from folium import plugins
+
+    from ..data.osrm import get_route_geometry_multi
+
     # Create base map centered on depot with CartoDB Light style
     m = folium.Map(location=[depot_lat, depot_lon], zoom_start=11, tiles=None)
 
@@ -82,8 +126,53 @@ def build_folium_map(
     # Generate colors for each vehicle
     colors = generate_colors(result.vehicles_used)
 
-    # Track plotted pharmacies to avoid duplicates
-    plotted_pharmacies = set()
+    # Per-route coordinate arrays, extracted from the stop dicts once
+    soa = routes_to_soa(result.routes)
+
+    # Collect each pharmacy once (first visit wins) so markers are drawn in a single pass
+    unique_pharmacies: dict[tuple[float, float], tuple[int, int, str, int]] = {}
+    for i, route in enumerate(result.routes):
+        arrays = soa[i]
+        lats = arrays["lat"].tolist()
+        lons = arrays["lon"].tolist()
+        arrivals = arrays["arrival"].tolist()
+        for j in np.flatnonzero(~arrays["is_depot"]).tolist():
+            unique_pharmacies.setdefault(
+                (lats[j], lons[j]),
+                (route["vehicle"], j, route["stops"][j]["name"], arrivals[j]),
+            )
+
+    pharmacy_group = folium.FeatureGroup(name=f"Pharmacies ({len(unique_pharmacies)})", show=True)
+    for (lat, lon), (vehicle, j, name, arrival_time) in unique_pharmacies.items():
+        # Format arrival time
+        hours = arrival_time // 3600
+        minutes = (arrival_time % 3600) // 60
+        time_str = f"{hours:02d}:{minutes:02d}"
+
+        # Use pharmacy icon marker instead of circle
+        popup_html = _PHARMACY_POPUP_TEMPLATE.format(
+            name=name, vehicle=vehicle, stop=j, arrival=time_str
+        )
+        folium.Marker(
+            [round(lat, COORD_PRECISION), round(lon, COORD_PRECISION)],
+            popup=folium.Popup(popup_html, max_width=250),
+            tooltip=f"{name} ({time_str})",
+            icon=folium.Icon(**_PHARMACY_ICON_KWARGS),
+        ).add_to(pharmacy_group)
+    pharmacy_group.add_to(m)
+
+    # Fetch OSRM geometry for all routes up front; the requests are I/O-bound so they overlap
+    waypoints_by_route = {
+        i: list(zip(arrays["lat"].tolist(), arrays["lon"].tolist(), strict=True))
+        for i, arrays in soa.items()
+        if len(arrays["lat"]) >= 2
+    }
+    with ThreadPoolExecutor(max_workers=_OSRM_MAX_WORKERS) as executor:
+        futures = {
+            i: executor.submit(get_route_geometry_multi, osrm_url, waypoints)
+            for i, waypoints in waypoints_by_route.items()
+        }
+        geometry_by_route = {i: future.result() for i, future in futures.items()}
 
     # Add routes for each vehicle
     routes_added = 0
@@ -100,70 +189,28 @@ def build_folium_map(
             show=True,  # Ensure layer is visible by default
         )
 
-        # Process route stops
-        route_coords = []
-        for j, stop in enumerate(route["stops"]):
-            stop_lat, stop_lon = stop["lat"], stop["lon"]
-            route_coords.append([stop_lat, stop_lon])
-
-            # Add pharmacy markers (skip depot)
-            if not stop["is_depot"]:
-                pharmacy_key = (stop["lat"], stop["lon"])
-                if pharmacy_key not in plotted_pharmacies:
-                    # Format arrival time
-                    arrival_time = stop["arrival_time"]
-                    hours = arrival_time // 3600
-                    minutes = (arrival_time % 3600) // 60
-                    time_str = f"{hours:02d}:{minutes:02d}"
-
-                    # Use pharmacy icon marker instead of circle
-                    folium.Marker(
-                        [stop_lat, stop_lon],
-                        popup=folium.Popup(
-                            f"<b>💊 {stop['name']}</b><br/>"
-                            f"Vehicle: {route['vehicle']}<br/>"
-                            f"Stop: {j}<br/>"
-                            f"Arrival: {time_str}",
-                            max_width=250,
-                        ),
-                        tooltip=f"{stop['name']} ({time_str})",
-                        icon=folium.Icon(
-                            color="blue",
-                            icon="plus-square",  # Medical cross symbol
-                            prefix="fa",
-                        ),
-                    ).add_to(vehicle_group)
-                    plotted_pharmacies.add(pharmacy_key)
-
-        # Add route lines with OSRM geometry
-        for j in range(len(route["stops"]) - 1):
-            start_stop = route["stops"][j]
-            end_stop = route["stops"][j + 1]
-
-            # Get OSRM route geometry between consecutive stops
-            route_geometry = get_route_geometry(
-                osrm_url, start_stop["lat"], start_stop["lon"], end_stop["lat"], end_stop["lon"]
-            )
+        # Geometry (decoded polyline or fallback waypoints) is already at 5-decimal precision
+        route_geometry = geometry_by_route[i]
 
-            # Add route segment with OSRM geometry - match original style
-            route_line = folium.PolyLine(
-                locations=route_geometry,
-                color=color,
-                weight=3,  # Slightly thinner lines
-                opacity=0.7,  # Match original opacity
-                popup=f"Vehicle {route['vehicle']}: {start_stop['name']} → {end_stop['name']}",
-            )
-            route_line.add_to(vehicle_group)
-
-            # Add direction arrows on the route segment
-            if len(route_geometry) >= 2:
-                plugins.PolyLineTextPath(
-                    route_line,
-                    "  ►  ",
-                    repeat=True,
-                    offset=7,
-                    attributes={"fill": color, "font-weight": "bold", "font-size": "10"},
-                ).add_to(vehicle_group)
+        # Add the whole route as a single line with OSRM geometry - match original style
+        route_line = folium.PolyLine(
+            locations=route_geometry,
+            color=color,
+            weight=3,  # Slightly thinner lines
+            opacity=0.7,  # Match original opacity
+            popup=f"Vehicle {route['vehicle']} ({len(route['stops']) - 2} stops)",
+        )
+        route_line.add_to(vehicle_group)
+
+        # Add direction arrows along the route
+        if len(route_geometry) >= 2:
+            plugins.PolyLineTextPath(
+                route_line,
+                "  ►  ",
+                repeat=True,
+                offset=7,
+                attributes={"fill": color, "font-weight": "bold", "font-size": "10"},
+            ).add_to(vehicle_group)
 
         # Add vehicle group to map
         vehicle_group.add_to(m)
@@ -206,7 +253,7 @@ def build_folium_map(
     plugins.Fullscreen().add_to(m)
 
     # Save map
-    m.save(output_path)
+    _save_map(m, output_path, gzip_output)
     print(f"Interactive map saved to: {output_path} (added {routes_added} vehicle routes)")
 
 
@@ -215,6 +262,8 @@ def create_overview_map(
     depot_lon: float,
     pharmacies: list[dict[str, str | float]],
     output_path: str = "pharmacies_overview.html",
+    gzip_output: bool = False,
+    radius_km: float = 50,
 ) -> None:
     """Create overview map showing all available pharmacies.
 
@@ -223,9 +272,29 @@ def create_overview_map(
         depot_lon: Depot longitude
         pharmacies: List of pharmacy dictionaries
         output_path: Path to save the HTML map
+        gzip_output: Also write a gzip-compressed copy of the HTML map
+        radius_km: Search radius around the depot; pharmacies outside it are not drawn
     """
+    import folium
+
+    # Only draw pharmacies inside the search radius shown on the map
+    if pharmacies:
+        distances = haversine_km(
+            depot_lat,
+            depot_lon,
+            [p["lat"] for p in pharmacies],
+            [p["lon"] for p in pharmacies],
+        )
+        pharmacies = [p for p, d in zip(pharmacies, distances <= radius_km, strict=True) if d]
+
     # Create base map
-    m = folium.Map(location=[depot_lat, depot_lon], zoom_start=9, tiles="OpenStreetMap")
+    # Canvas renderer draws all vector markers into a single <canvas> element
+    m = folium.Map(
+        location=[depot_lat, depot_lon],
+        zoom_start=9,
+        tiles="OpenStreetMap",
+        prefer_canvas=True,
+    )
 
     # Add depot marker with warehouse icon
     folium.Marker(
@@ -235,20 +304,24 @@ def create_overview_map(
         icon=folium.Icon(color="red", icon="warehouse", prefix="fa"),
     ).add_to(m)
 
-    # Add all pharmacies with medical icons
+    # Add all pharmacies as lightweight circle markers
     for pharmacy in pharmacies:
-        folium.Marker(
-            [pharmacy["lat"], pharmacy["lon"]],
+        folium.CircleMarker(
+            [round(pharmacy["lat"], COORD_PRECISION), round(pharmacy["lon"], COORD_PRECISION)],
+            radius=4,
             popup=f"💊 {pharmacy['name']}",
             tooltip=pharmacy["name"],
-            icon=folium.Icon(color="lightblue", icon="plus-square", prefix="fa"),
+            color="#3186cc",
+            fill=True,
+            fill_opacity=0.8,
+            weight=1,
         ).add_to(m)
 
     # Add search radius circle
     folium.Circle(
         [depot_lat, depot_lon],
-        radius=50000,  # 50km in meters
-        popup="50km Search Radius",
+        radius=radius_km * 1000,  # km to meters
+        popup=f"{radius_km:g}km Search Radius",
         color="gray",
         fillColor="gray",
         fillOpacity=0.1,
@@ -264,12 +337,12 @@ def create_overview_map(
                 font-size:14px; padding: 10px;'>
     <h4>Pharmacy Overview</h4>
     <b>Total Pharmacies:</b> {len(pharmacies)}<br/>
-    <b>Search Radius:</b> 50 km<br/>
+    <b>Search Radius:</b> {radius_km:g} km<br/>
     <b>Center:</b> Depot
     </div>
     """
     m.get_root().html.add_child(folium.Element(info_html))
 
     # Save map
-    m.save(output_path)
+    _save_map(m, output_path, gzip_output)
     print(f"Pharmacy overview map saved to: {output_path}")
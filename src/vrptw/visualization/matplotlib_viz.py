@@ -1,9 +1,12 @@
 """Matplotlib-based static visualization for VRPTW solutions."""
 
-import matplotlib.colors as mcolors
-import matplotlib.pyplot as plt
+import numpy as np
 
 from ..solver import VRPResult
+from ..utils import routes_to_soa
+
+# Direction arrows are decorative; draw at most this many per route
+_MAX_ARROWS_PER_ROUTE = 5
 
 
 def generate_colors(n: int) -> list[str]:
@@ -20,8 +23,15 @@ def generate_colors(n: int) -> list[str]:
     if n == 1:
         return ["#1f77b4"]
 
+    import matplotlib as mpl
+    import matplotlib.colors as mcolors
+
     # Use matplotlib's tab10 for up to 10 colors, then cycle through viridis
-    colors = plt.cm.tab10(range(n)) if n <= 10 else plt.cm.viridis([i / (n - 1) for i in range(n)])
+    colors = (
+        mpl.colormaps["tab10"](range(n))
+        if n <= 10
+        else mpl.colormaps["viridis"]([i / (n - 1) for i in range(n)])
+    )
 
     return [mcolors.to_hex(color) for color in colors]
 
@@ -33,6 +43,7 @@ def plot_vrp_matplotlib(
     output_path: str = "vrp_routes.png",
     show_plot: bool = False,
     figsize: tuple[int, int] = (12, 10),
+    dpi: int = 150,
 ) -> None:
     """Create static plot of VRPTW solution using matplotlib.
 
@@ -43,18 +54,35 @@ def plot_vrp_matplotlib(
         output_path: Path to save the plot
         show_plot: Whether to display the plot
         figsize: Figure size (width, height) in inches
+        dpi: Resolution of the saved image
     """
     if result.status != "OK" or not result.routes:
         print(f"No solution to plot (status: {result.status})")
         return
 
-    plt.figure(figsize=figsize)
+    # Deferred so importing the package does not pay for matplotlib
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+    from matplotlib.lines import Line2D
+
+    # Only go through pyplot (and its GUI backend) when the plot is shown interactively;
+    # a standalone Figure renders to file via Agg and is never registered with pyplot
+    if show_plot:
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=figsize)
+    else:
+        fig = Figure(figsize=figsize)
+        ax = fig.subplots()
 
     # Generate colors for each vehicle
     colors = generate_colors(result.vehicles_used)
 
+    # Per-route coordinate arrays, extracted from the stop dicts once
+    soa = routes_to_soa(result.routes)
+
     # Plot depot with better warehouse symbol
-    plt.scatter(
+    ax.scatter(
         depot_lon,
         depot_lat,
         c="darkred",
@@ -66,129 +94,161 @@ def plot_vrp_matplotlib(
         linewidths=2,
     )
 
-    # Track plotted pharmacies to avoid duplicates
-    plotted_pharmacies = set()
+    # Plot each pharmacy location once with medical cross symbol
+    pharmacy_points = np.concatenate(
+        [np.column_stack((a["lon"], a["lat"]))[~a["is_depot"]] for a in soa.values()]
+    )
+    if len(pharmacy_points):
+        # Keep the first occurrence of each location in visiting order
+        _, first_idx = np.unique(pharmacy_points, axis=0, return_index=True)
+        pharmacy_points = pharmacy_points[np.sort(first_idx)]
+        ax.scatter(
+            pharmacy_points[:, 0],
+            pharmacy_points[:, 1],
+            c="mediumblue",
+            s=80,
+            marker="+",
+            alpha=0.8,
+            zorder=2,
+            linewidths=3,
+        )
 
-    # Plot routes for each vehicle
+    # Collect all routes so lines and arrows are drawn as one artist each
+    route_lines = []
+    line_colors = []
+    vehicle_handles = []
+    arrow_starts = []
+    arrow_deltas = []
+    arrow_colors = []
     for i, route in enumerate(result.routes):
         if not route["stops"] or len(route["stops"]) < 2:
             continue
 
         color = colors[i % len(colors)] if colors else "#1f77b4"
 
-        # Extract coordinates for this route
-        route_lons = []
-        route_lats = []
-
-        for stop in route["stops"]:
-            route_lons.append(stop["lon"])
-            route_lats.append(stop["lat"])
-
-            # Plot pharmacy locations with medical cross symbol (skip depot)
-            if not stop["is_depot"]:
-                pharmacy_key = (stop["lat"], stop["lon"])
-                if pharmacy_key not in plotted_pharmacies:
-                    plt.scatter(
-                        stop["lon"],
-                        stop["lat"],
-                        c="mediumblue",
-                        s=80,
-                        marker="+",
-                        alpha=0.8,
-                        zorder=2,
-                        linewidths=3,
-                    )
-                    plotted_pharmacies.add(pharmacy_key)
-
-        # Plot route line
-        plt.plot(
-            route_lons,
-            route_lats,
-            color=color,
-            linewidth=2,
-            alpha=0.8,
-            label=f"Vehicle {route['vehicle']} ({len(route['stops']) - 2} stops)",
+        # (lon, lat) coordinates for this route
+        coords = np.column_stack((soa[i]["lon"], soa[i]["lat"]))
+        route_lines.append(coords)
+        line_colors.append(color)
+        vehicle_handles.append(
+            Line2D(
+                [],
+                [],
+                color=color,
+                linewidth=2,
+                alpha=0.8,
+                label=f"Vehicle {route['vehicle']} ({len(route['stops']) - 2} stops)",
+            )
         )
 
+        # Arrows covering the first 30% of a few evenly spaced segments to show direction
+        n_segments = len(coords) - 1
+        idxs = np.linspace(0, n_segments - 1, num=min(_MAX_ARROWS_PER_ROUTE, n_segments), dtype=int)
+        arrow_starts.append(coords[idxs])
+        arrow_deltas.append((coords[idxs + 1] - coords[idxs]) * 0.3)
+        arrow_colors.extend([color] * len(idxs))
+
+    if route_lines:
+        # Plot route lines
+        lines = LineCollection(route_lines, colors=line_colors, linewidths=2, alpha=0.8)
+        lines.set_rasterized(True)
+        ax.add_collection(lines)
+
         # Add arrows to show direction
-        for j in range(len(route_lons) - 1):
-            dx = route_lons[j + 1] - route_lons[j]
-            dy = route_lats[j + 1] - route_lats[j]
-            plt.arrow(
-                route_lons[j],
-                route_lats[j],
-                dx * 0.3,
-                dy * 0.3,
-                head_width=0.001,
-                head_length=0.001,
-                fc=color,
-                ec=color,
-                alpha=0.6,
-            )
+        starts = np.concatenate(arrow_starts)
+        deltas = np.concatenate(arrow_deltas)
+        ax.quiver(
+            starts[:, 0],
+            starts[:, 1],
+            deltas[:, 0],
+            deltas[:, 1],
+            color=arrow_colors,
+            angles="xy",
+            scale_units="xy",
+            scale=1,
+            width=0.0025,
+            alpha=0.6,
+        )
+        ax.autoscale_view()
 
     # Formatting
-    plt.xlabel("Longitude")
-    plt.ylabel("Latitude")
-    plt.title(
+    ax.set_xlabel("Longitude")
+    ax.set_ylabel("Latitude")
+    ax.set_title(
         f"VRPTW Solution - {result.vehicles_used} Vehicles, "
         f"{result.total_distance_km:.1f}km, "
         f"{result.total_time_sec / 3600:.1f}h"
     )
 
-    # Legend
-    plt.legend(bbox_to_anchor=(1.05, 1), loc="upper left")
+    # Legend (route collection has no per-vehicle artists, so add proxy handles)
+    handles, _ = ax.get_legend_handles_labels()
+    ax.legend(handles=handles + vehicle_handles, bbox_to_anchor=(1.05, 1), loc="upper left")
 
     # Grid and equal aspect ratio
-    plt.grid(True, alpha=0.3)
-    plt.axis("equal")
+    ax.grid(True, alpha=0.3)
+    ax.axis("equal")
 
     # Adjust layout to prevent legend cutoff
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Save plot
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
+    fig.savefig(output_path, dpi=dpi, bbox_inches="tight")
     print(f"Static plot saved to: {output_path}")
 
     if show_plot:
         plt.show()
-    else:
-        plt.close()
+        plt.close(fig)
 
 
-def plot_solution_overview(result: VRPResult, output_path: str = "solution_overview.png") -> None:
+def plot_solution_overview(
+    result: VRPResult, output_path: str = "solution_overview.png", dpi: int = 150
+) -> None:
     """Create a summary plot with solution statistics.
 
     Args:
         result: VRPTW solution result
         output_path: Path to save the overview plot
+        dpi: Resolution of the saved image
     """
     if result.status != "OK":
         return
 
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
+    # File-only output, so a standalone Figure is enough and pyplot's figure stack is bypassed
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 8))
+    ((ax1, ax2), (ax3, ax4)) = fig.subplots(2, 2)
+
+    # Gather per-route statistics in a single pass over the routes
+    n_routes = len(result.routes)
+    loads = np.empty(n_routes, dtype=np.int64)
+    stops = np.empty(n_routes, dtype=np.int64)
+    durations_sec = np.zeros(n_routes)
+    for k, route in enumerate(result.routes):
+        loads[k] = route["load"]
+        stops[k] = len(route["stops"]) - 2  # exclude depot endpoints
+        if stops[k] > 0:
+            durations_sec[k] = (
+                route["stops"][-1]["arrival_time"] - route["stops"][0]["arrival_time"]
+            )
+    active = stops > 0
 
     # Vehicle utilization
-    vehicle_loads = [route["load"] for route in result.routes if route["load"] > 0]
-    ax1.bar(range(len(vehicle_loads)), vehicle_loads)
+    vehicle_loads = loads[loads > 0]
+    ax1.bar(np.arange(len(vehicle_loads)), vehicle_loads)
     ax1.set_title("Vehicle Loads")
     ax1.set_xlabel("Vehicle")
     ax1.set_ylabel("Load (pharmacies)")
 
     # Stops per vehicle
-    vehicle_stops = [len(route["stops"]) - 2 for route in result.routes if len(route["stops"]) > 2]
-    ax2.bar(range(len(vehicle_stops)), vehicle_stops)
+    vehicle_stops = stops[active]
+    ax2.bar(np.arange(len(vehicle_stops)), vehicle_stops)
     ax2.set_title("Stops per Vehicle")
     ax2.set_xlabel("Vehicle")
     ax2.set_ylabel("Number of Stops")
 
     # Route duration histogram
-    route_times = []
-    for route in result.routes:
-        if len(route["stops"]) > 2:
-            start_time = route["stops"][0]["arrival_time"]
-            end_time = route["stops"][-1]["arrival_time"]
-            duration_hours = (end_time - start_time) / 3600
-            route_times.append(duration_hours)
+    route_times = durations_sec[active] / 3600
 
     ax3.hist(route_times, bins=max(5, len(route_times) // 2), alpha=0.7)
     ax3.set_title("Route Duration Distribution")
@@ -196,7 +256,7 @@ def plot_solution_overview(result: VRPResult, output_path: str = "solution_overv
     ax3.set_ylabel("Number of Routes")
 
     # Summary statistics
-    total_pharmacies = sum(len(r["stops"]) - 2 for r in result.routes)
+    total_pharmacies = int(stops.sum())
     stats_text = f"""Solution Summary:
 Vehicles Used: {result.vehicles_used}
 Total Pharmacies: {total_pharmacies}
@@ -210,6 +270,7 @@ Avg Stops/Vehicle: {total_pharmacies / result.vehicles_used:.1f}"""
         stats_text,
         transform=ax4.transAxes,
         fontsize=11,
+        fontfamily="monospace",
         verticalalignment="center",
         bbox=dict(boxstyle="round", facecolor="lightgray"),
     )
@@ -218,7 +279,6 @@ Avg Stops/Vehicle: {total_pharmacies / result.vehicles_used:.1f}"""
     ax4.axis("off")
     ax4.set_title("Statistics")
 
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi, bbox_inches="tight")
     print(f"Solution overview saved to: {output_path}")
-    plt.close()
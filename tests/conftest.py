@@ -0,0 +1,17 @@
+"""Shared pytest fixtures for VRPTW tests."""
+
+import pytest
+
+from src.vrptw.config import VRPConfig
+
+
+@pytest.fixture(scope="session")
+def default_vrp_config():
+    """Default VRP configuration, built once per test session."""
+    return VRPConfig()
+
+
+@pytest.fixture
+def scenario_tmpdir(tmp_path_factory):
+    """Fresh scenario output directory under the session's shared temp root."""
+    return tmp_path_factory.mktemp("scen")
@@ -0,0 +1,26 @@
+"""Tests for folium map output helpers."""
+
+import gzip
+
+import folium
+
+from src.vrptw.visualization.folium_viz import _save_map
+
+
+class TestSaveMap:
+    """Tests for _save_map HTML post-processing."""
+
+    def test_save_map_keeps_inline_spaces(self, tmp_path):
+        """Test indentation between tags is collapsed but visible inline spaces survive."""
+        m = folium.Map(location=[49.5, 11.0], zoom_start=11, tiles=None)
+        m.get_root().html.add_child(
+            folium.Element("<div>\n    <b>Status:</b> <span>OK</span>\n</div>")
+        )
+        output_path = tmp_path / "map.html"
+
+        _save_map(m, str(output_path), gzip_output=True)
+
+        html = output_path.read_text(encoding="utf-8")
+        assert "<b>Status:</b> <span>OK</span>" in html
+        assert "<div><b>Status:</b>" in html
+        assert gzip.decompress((tmp_path / "map.html.gz").read_bytes()).decode("utf-8") == html
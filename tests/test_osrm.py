@@ -0,0 +1,97 @@
+"""Tests for OSRM route geometry helpers."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src.vrptw.data.osrm import (
+    _decode_polyline,
+    _fetch_route_geometry,
+    get_route_geometry,
+    get_route_geometry_multi,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_geometry_cache():
+    """Isolate tests from geometry cached by other tests."""
+    _fetch_route_geometry.cache_clear()
+    yield
+    _fetch_route_geometry.cache_clear()
+
+
+def _osrm_response(coords: list[list[float]]) -> MagicMock:
+    """Build a mocked OSRM /route response with the given [lon, lat] coordinates."""
+    response = MagicMock()
+    response.json.return_value = {"code": "Ok", "routes": [{"geometry": {"coordinates": coords}}]}
+    return response
+
+
+class TestRouteGeometry:
+    """Tests for get_route_geometry."""
+
+    @patch("src.vrptw.data.osrm.requests.get")
+    def test_get_route_geometry_cached(self, mock_get):
+        """Test repeated segments are served from the cache."""
+        mock_get.return_value = _osrm_response([[11.0, 49.5], [11.05, 49.55], [11.1, 49.6]])
+
+        first = get_route_geometry("http://osrm", 49.5, 11.0, 49.6, 11.1)
+        second = get_route_geometry("http://osrm", 49.5000001, 11.0, 49.6, 11.1)
+
+        assert first == [(49.5, 11.0), (49.55, 11.05), (49.6, 11.1)]
+        assert second == first
+        assert mock_get.call_count == 1
+
+    @patch("src.vrptw.data.osrm.requests.get")
+    def test_get_route_geometry_failure_not_cached(self, mock_get):
+        """Test failed lookups fall back to a direct line and are retried."""
+        mock_get.side_effect = requests.ConnectionError("OSRM down")
+
+        geometry = get_route_geometry("http://osrm", 49.5, 11.0, 49.6, 11.1)
+        assert geometry == [(49.5, 11.0), (49.6, 11.1)]
+
+        mock_get.side_effect = None
+        mock_get.return_value = _osrm_response([[11.0, 49.5], [11.1, 49.6]])
+
+        get_route_geometry("http://osrm", 49.5, 11.0, 49.6, 11.1)
+        assert mock_get.call_count == 2
+
+
+class TestRouteGeometryMulti:
+    """Tests for get_route_geometry_multi and polyline decoding."""
+
+    def test_decode_polyline(self):
+        """Test decoding the reference polyline from the format specification."""
+        coords = _decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+
+        assert coords == [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+    @patch("src.vrptw.data.osrm.requests.get")
+    def test_get_route_geometry_multi(self, mock_get):
+        """Test the whole route is requested once as a simplified polyline."""
+        mock_get.return_value.json.return_value = {
+            "code": "Ok",
+            "routes": [{"geometry": "_p~iF~ps|U_ulLnnqC_mqNvxq`@"}],
+        }
+
+        waypoints = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        geometry = get_route_geometry_multi("http://osrm", waypoints)
+
+        assert geometry == waypoints
+        assert mock_get.call_count == 1
+        params = mock_get.call_args.kwargs["params"]
+        assert params["overview"] == "simplified"
+        assert params["geometries"] == "polyline"
+
+    @patch("src.vrptw.data.osrm.requests.get")
+    def test_get_route_geometry_multi_fallback(self, mock_get):
+        """Test failed lookups fall back to rounded direct lines through the waypoints."""
+        mock_get.side_effect = requests.ConnectionError("OSRM down")
+
+        waypoints = [(49.5000012, 11.0), (49.6, 11.1000049), (49.5000012, 11.0)]
+        assert get_route_geometry_multi("http://osrm", waypoints) == [
+            (49.5, 11.0),
+            (49.6, 11.1),
+            (49.5, 11.0),
+        ]
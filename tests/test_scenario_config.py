@@ -1,6 +1,9 @@
 """Tests for VRPTW scenario configuration."""
 
-from src.vrptw.config import VRPConfig
+from dataclasses import FrozenInstanceError, replace
+
+import pytest
+
 from src.vrptw.scenario_config import (
     ScenarioParams,
     create_vrp_config_for_scenario,
@@ -10,6 +13,15 @@ from src.vrptw.scenario_config import (
     get_scenarios_by_time_window,
 )
 
+_EXPECTED_RADII = frozenset(range(5, 80, 5))  # 5, 10, 15, ..., 75
+_EXPECTED_TW_HOURS = frozenset(range(2, 11))  # 2, 3, 4, ..., 10
+
+
+@pytest.fixture(scope="session")
+def all_scenarios():
+    """All generated scenarios, built once per test session."""
+    return generate_all_scenarios()
+
 
 class TestScenarioParams:
     """Tests for ScenarioParams data class."""
@@ -36,6 +48,14 @@ class TestScenarioParams:
         assert params.depot_tw_start == 5 * 3600
         assert params.depot_tw_end == 19 * 3600
 
+    def test_scenario_params_immutable(self, all_scenarios):
+        """Test shared scenario params cannot be modified in place."""
+        scenario = all_scenarios[0]
+
+        with pytest.raises(FrozenInstanceError):
+            scenario.radius_km = 99.0
+        assert not hasattr(scenario, "__dict__")
+
 
 class TestScenarioIdGeneration:
     """Tests for scenario ID generation."""
@@ -55,34 +75,32 @@ class TestScenarioIdGeneration:
 class TestScenarioGeneration:
     """Tests for scenario parameter generation."""
 
-    def test_generate_all_scenarios_count(self):
+    def test_generate_all_scenarios_count(self, all_scenarios):
         """Test that correct number of scenarios are generated."""
-        scenarios = generate_all_scenarios()
-
         # 15 radii (5-75 in steps of 5) × 9 time windows (2-10 hours) × 10 service times (1-10 min) = 1350 scenarios
-        assert len(scenarios) == 1350
+        assert len(all_scenarios) == 1350
 
-    def test_generate_all_scenarios_radii(self):
-        """Test scenario radii coverage."""
+    def test_generate_all_scenarios_cached(self):
+        """Test that repeated calls share one immutable scenario tuple."""
         scenarios = generate_all_scenarios()
-        radii = set(s.radius_km for s in scenarios)
 
-        expected_radii = set(range(5, 80, 5))  # 5, 10, 15, ..., 75
-        assert radii == expected_radii
+        assert isinstance(scenarios, tuple)
+        assert generate_all_scenarios() is scenarios
 
-    def test_generate_all_scenarios_time_windows(self):
-        """Test scenario time window coverage."""
-        scenarios = generate_all_scenarios()
-        tw_hours = set(s.client_tw_hours for s in scenarios)
+    def test_scenario_invariants(self, all_scenarios):
+        """Test radii, time window and ID invariants in a single pass."""
+        radii = set()
+        tw_hours = set()
+        scenario_ids = set()
 
-        expected_tw_hours = set(range(2, 11))  # 2, 3, 4, ..., 10
-        assert tw_hours == expected_tw_hours
+        for scenario in all_scenarios:
+            radii.add(scenario.radius_km)
+            tw_hours.add(scenario.client_tw_hours)
 
-    def test_scenario_time_window_consistency(self):
-        """Test time window start/end consistency."""
-        scenarios = generate_all_scenarios()
+            # IDs are unique; fails on the first duplicate
+            assert scenario.scenario_id not in scenario_ids
+            scenario_ids.add(scenario.scenario_id)
 
-        for scenario in scenarios:
             # Client TW always starts at 07:00
             assert scenario.client_tw_start == 7 * 3600
 
@@ -94,18 +112,14 @@ class TestScenarioGeneration:
             assert scenario.depot_tw_start == 5 * 3600
             assert scenario.depot_tw_end == 19 * 3600
 
-    def test_scenario_id_uniqueness(self):
-        """Test that all scenario IDs are unique."""
-        scenarios = generate_all_scenarios()
-        scenario_ids = [s.scenario_id for s in scenarios]
-
-        assert len(scenario_ids) == len(set(scenario_ids))  # All unique
+        assert radii == _EXPECTED_RADII
+        assert tw_hours == _EXPECTED_TW_HOURS
 
 
 class TestVRPConfigCreation:
     """Tests for VRP config creation from scenarios."""
 
-    def test_create_vrp_config_for_scenario(self):
+    def test_create_vrp_config_for_scenario(self, default_vrp_config):
         """Test VRP config creation from scenario params."""
         scenario = ScenarioParams(
             scenario_id="20_06_04",
@@ -131,14 +145,15 @@ class TestVRPConfigCreation:
         assert config.service_time_sec == 240
 
         # Base config parameters should be preserved
-        base_config = VRPConfig()
-        assert config.center_lat == base_config.center_lat
-        assert config.center_lon == base_config.center_lon
-        assert config.vehicle_capacity == base_config.vehicle_capacity
+        assert config.center_lat == default_vrp_config.center_lat
+        assert config.center_lon == default_vrp_config.center_lon
+        assert config.vehicle_capacity == default_vrp_config.vehicle_capacity
 
-    def test_create_vrp_config_with_custom_base(self):
+    def test_create_vrp_config_with_custom_base(self, default_vrp_config):
         """Test VRP config creation with custom base config."""
-        custom_base = VRPConfig(center_lat=50.0, center_lon=10.0, vehicle_capacity=100)
+        custom_base = replace(
+            default_vrp_config, center_lat=50.0, center_lon=10.0, vehicle_capacity=100
+        )
 
         scenario = ScenarioParams(
             scenario_id="15_04_07",
@@ -164,6 +179,15 @@ class TestVRPConfigCreation:
         assert config.client_tw_end == 11 * 3600
         assert config.service_time_sec == 420
 
+    def test_create_vrp_config_memoized(self, all_scenarios, default_vrp_config):
+        """Test repeated calls for the same scenario and base return the same config."""
+        scenario = all_scenarios[0]
+
+        config = create_vrp_config_for_scenario(scenario, default_vrp_config)
+
+        assert create_vrp_config_for_scenario(scenario, default_vrp_config) is config
+        assert create_vrp_config_for_scenario(all_scenarios[1], default_vrp_config) is not config
+
 
 class TestScenarioFiltering:
     """Tests for scenario filtering functions."""
@@ -181,7 +205,7 @@ class TestScenarioFiltering:
 
         # Should cover all time windows
         tw_hours = set(s.client_tw_hours for s in scenarios_10km)
-        assert tw_hours == set(range(2, 11))
+        assert tw_hours == _EXPECTED_TW_HOURS
 
     def test_get_scenarios_by_time_window(self):
         """Test filtering scenarios by time window length."""
@@ -196,7 +220,7 @@ class TestScenarioFiltering:
 
         # Should cover all radii
         radii = set(s.radius_km for s in scenarios_6h)
-        assert radii == set(range(5, 80, 5))
+        assert radii == _EXPECTED_RADII
 
     def test_get_scenarios_edge_cases(self):
         """Test edge cases for scenario filtering."""
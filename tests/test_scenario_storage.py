@@ -1,24 +1,57 @@
 """Tests for VRPTW scenario storage functionality."""
 
 import json
-import tempfile
+import math
 from pathlib import Path
 
+import numpy as np
 import polars as pl
-import pytest
 
 from src.vrptw.scenario_config import ScenarioParams
 from src.vrptw.scenario_storage import (
+    InMemoryCompletedStore,
     calculate_pharmacy_distances,
+    collect_route_stops,
     get_scenario_summary_stats,
+    get_scenario_summary_stats_from_df,
     initialize_scenario_data_directory,
     load_completed_scenarios,
+    load_completed_scenarios_cached,
     mark_scenario_completed,
+    mark_scenarios_completed,
     store_pharmacies_data,
     store_scenario_result,
 )
 from src.vrptw.solver import VRPResult
 
+_SUCCESS_DF = pl.DataFrame(
+    {
+        "scenario_id": ["05_02", "10_04", "15_06"],
+        "radius_km": [5, 10, 15],
+        "client_tw_hours": [2, 4, 6],
+        "pharmacies_count": [20, 50, 80],
+        "vehicles_used": [2, 5, 8],
+        "total_distance_km": [100.0, 250.0, 400.0],
+        "total_time_sec": [3600, 7200, 10800],
+        "execution_time_sec": [30.0, 45.0, 60.0],
+        "status": ["OK", "OK", "OK"],
+    }
+)
+
+_MIXED_DF = pl.DataFrame(
+    {
+        "scenario_id": ["05_02", "10_04"],
+        "radius_km": [5, 10],
+        "client_tw_hours": [2, 4],
+        "pharmacies_count": [20, 50],
+        "vehicles_used": [2, 0],  # Second scenario failed
+        "total_distance_km": [100.0, 0.0],
+        "total_time_sec": [3600, 0],
+        "execution_time_sec": [30.0, 15.0],
+        "status": ["OK", "INFEASIBLE"],
+    }
+)
+
 
 class TestPharmacyDistanceCalculation:
     """Tests for pharmacy distance calculations with Polars."""
@@ -45,10 +78,55 @@ class TestPharmacyDistanceCalculation:
 
         # Check distance calculations
         distances = df["distance_from_center_km"].to_list()
-        assert distances[0] == pytest.approx(0.0, abs=0.1)  # Same location
+        assert -0.1 < distances[0] < 0.1  # Same location
         assert distances[1] > 0  # Different location
         assert distances[1] < 10  # Reasonable distance for nearby location
 
+    def test_calculate_pharmacy_distances_dataframe(self):
+        """Test distance calculation from a pharmacy DataFrame."""
+        pharmacies_df = pl.DataFrame(
+            {
+                "id": ["1", "2"],
+                "name": ["Pharmacy A", "Pharmacy B"],
+                "lat": [49.517037, 49.496891],
+                "lon": [11.088860, 11.003860],
+            }
+        )
+
+        df = calculate_pharmacy_distances(pharmacies_df, 49.517037, 11.088860)
+
+        assert df.columns == [*pharmacies_df.columns, "distance_from_center_km"]
+        distances = df["distance_from_center_km"].to_numpy()
+        np.testing.assert_allclose(distances, [0.0, 6.53], atol=0.1)
+
+    def test_calculate_pharmacy_distances_vectorized(self):
+        """Test distance calculation over many pharmacies against a scalar reference."""
+        rng = np.random.default_rng(42)
+        n = 10_000
+        lats = rng.uniform(49.0, 50.0, n)
+        lons = rng.uniform(10.5, 11.5, n)
+        pharmacies_df = pl.DataFrame(
+            {"id": [str(i) for i in range(n)], "name": ["P"] * n, "lat": lats, "lon": lons}
+        )
+
+        df = calculate_pharmacy_distances(pharmacies_df, 49.5, 11.0)
+
+        def haversine(lat, lon):
+            dlat = math.radians(lat - 49.5)
+            dlon = math.radians(lon - 11.0)
+            a = (
+                math.sin(dlat / 2) ** 2
+                + math.cos(math.radians(49.5))
+                * math.cos(math.radians(lat))
+                * math.sin(dlon / 2) ** 2
+            )
+            return 2 * 6371 * math.asin(math.sqrt(a))
+
+        distances = df["distance_from_center_km"].to_numpy()
+        assert len(distances) == n
+        expected = [haversine(lat, lon) for lat, lon in zip(lats[:100], lons[:100], strict=True)]
+        np.testing.assert_allclose(distances[:100], expected, rtol=1e-9)
+
     def test_calculate_pharmacy_distances_empty(self):
         """Test distance calculation with empty pharmacy list."""
         df = calculate_pharmacy_distances([], 49.5, 11.0)
@@ -60,32 +138,30 @@ class TestPharmacyDistanceCalculation:
 class TestScenarioDataDirectory:
     """Tests for scenario data directory management."""
 
-    def test_initialize_scenario_data_directory(self):
+    def test_initialize_scenario_data_directory(self, scenario_tmpdir):
         """Test scenario data directory initialization."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir) / "test_scenarios"
+        output_dir = scenario_tmpdir / "test_scenarios"
 
-            initialize_scenario_data_directory(output_dir)
+        initialize_scenario_data_directory(output_dir)
 
-            # Check directory structure
-            assert output_dir.exists()
-            assert (output_dir / "routes").exists()
-            assert (output_dir / "metadata.json").exists()
+        # Check directory structure
+        assert output_dir.exists()
+        assert (output_dir / "routes").exists()
+        assert (output_dir / "metadata.json").exists()
 
-            # Check metadata content
-            with open(output_dir / "metadata.json") as f:
-                metadata = json.load(f)
+        # Check metadata content
+        metadata = json.loads((output_dir / "metadata.json").read_bytes())
 
-            assert "dataset" in metadata
-            assert "total_scenarios" in metadata
-            assert metadata["total_scenarios"] == 1350
-            assert "parameters" in metadata
+        assert "dataset" in metadata
+        assert "total_scenarios" in metadata
+        assert metadata["total_scenarios"] == 1350
+        assert "parameters" in metadata
 
 
 class TestPharmacyDataStorage:
     """Tests for pharmacy data storage."""
 
-    def test_store_pharmacies_data(self):
+    def test_store_pharmacies_data(self, scenario_tmpdir):
         """Test storing pharmacy data as parquet."""
         pharmacies_df = pl.DataFrame(
             {
@@ -97,24 +173,21 @@ class TestPharmacyDataStorage:
             }
         )
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir)
+        parquet_file = store_pharmacies_data(pharmacies_df, scenario_tmpdir)
 
-            store_pharmacies_data(pharmacies_df, output_dir)
+        # Check file exists
+        assert parquet_file.parent == scenario_tmpdir
+        assert parquet_file.exists()
 
-            # Check file exists
-            parquet_file = output_dir / "pharmacies.parquet"
-            assert parquet_file.exists()
-
-            # Check data integrity
-            loaded_df = pl.read_parquet(parquet_file)
-            assert loaded_df.equals(pharmacies_df)
+        # Check data integrity (memory-mapped, no extra copy)
+        loaded_df = pl.read_parquet(parquet_file, memory_map=True)
+        assert loaded_df.equals(pharmacies_df)
 
 
 class TestScenarioResultStorage:
     """Tests for scenario result storage."""
 
-    def test_store_scenario_result_new_file(self):
+    def test_store_scenario_result_new_file(self, tmp_path):
         """Test storing scenario result when CSV doesn't exist."""
         scenario = ScenarioParams(
             scenario_id="10_04_06",
@@ -143,155 +216,173 @@ class TestScenarioResultStorage:
             "status": "OK",
         }
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir)
-            (output_dir / "routes").mkdir()
-
-            store_scenario_result(
-                scenario=scenario,
-                result=result,
-                route_geometries=route_geometries,
-                pharmacies_count=25,
-                execution_time_sec=45.2,
-                output_dir=output_dir,
-            )
+        (tmp_path / "routes").mkdir()
+
+        store_scenario_result(
+            scenario=scenario,
+            result=result,
+            route_geometries=route_geometries,
+            pharmacies_count=25,
+            execution_time_sec=45.2,
+            output_dir=tmp_path,
+        )
+
+        # Check CSV file
+        csv_file = tmp_path / "scenarios.csv"
+        assert csv_file.exists()
+
+        df = pl.read_csv(csv_file)
+        assert len(df) == 1
+        assert df["scenario_id"][0] == "10_04_06"
+        assert df["service_time_sec"][0] == 360
+        assert df["vehicles_used"][0] == 1
+        assert df["pharmacies_count"][0] == 25
+
+        # Check JSON route file
+        route_file = tmp_path / "routes" / "scenario_10_04_06.json"
+        assert route_file.exists()
+
+        route_data = json.loads(route_file.read_bytes())
+
+        assert route_data["scenario_id"] == "10_04_06"
+        assert route_data["parameters"]["service_time_sec"] == 360
+        assert route_data["solution"]["vehicles_used"] == 1
+
+    def test_store_scenario_result_without_geometries(self, tmp_path):
+        """Test storing scenario result without OSRM geometries."""
+        scenario = ScenarioParams(
+            scenario_id="10_04_06",
+            radius_km=10.0,
+            client_tw_hours=4,
+            client_tw_start=7 * 3600,
+            client_tw_end=11 * 3600,
+            depot_tw_start=5 * 3600,
+            depot_tw_end=19 * 3600,
+            service_time_sec=360,
+        )
 
-            # Check CSV file
-            csv_file = output_dir / "scenarios.csv"
-            assert csv_file.exists()
+        depot = {"node": 0, "is_depot": True, "arrival_time": 25200, "name": "DEPOT"}
+        stops = [
+            {**depot, "lat": 49.5, "lon": 11.0},
+            {
+                "node": 1,
+                "is_depot": False,
+                "arrival_time": 26000,
+                "name": "A",
+                "lat": 49.6,
+                "lon": 11.1,
+            },
+            {**depot, "lat": 49.5, "lon": 11.0},
+        ]
+        result = VRPResult(
+            routes=[{"vehicle": 0, "stops": stops, "load": 1}],
+            total_distance_km=12.5,
+            total_time_sec=1800,
+            vehicles_used=1,
+            status="OK",
+        )
 
-            df = pl.read_csv(csv_file)
-            assert len(df) == 1
-            assert df["scenario_id"][0] == "10_04_06"
-            assert df["service_time_sec"][0] == 360
-            assert df["vehicles_used"][0] == 1
-            assert df["pharmacies_count"][0] == 25
+        (tmp_path / "routes").mkdir()
 
-            # Check JSON route file
-            route_file = output_dir / "routes" / "scenario_10_04_06.json"
-            assert route_file.exists()
+        store_scenario_result(
+            scenario=scenario,
+            result=result,
+            route_geometries=collect_route_stops(result),
+            pharmacies_count=1,
+            execution_time_sec=1.0,
+            output_dir=tmp_path,
+        )
 
-            with open(route_file) as f:
-                route_data = json.load(f)
+        route_data = json.loads((tmp_path / "routes" / "scenario_10_04_06.json").read_bytes())
 
-            assert route_data["scenario_id"] == "10_04_06"
-            assert route_data["parameters"]["service_time_sec"] == 360
-            assert route_data["solution"]["vehicles_used"] == 1
+        routes = route_data["solution"]["routes"]
+        assert len(routes) == 1
+        assert routes[0]["stops"] == stops
+        assert "segments" not in routes[0]
+        assert route_data["solution"]["vehicles_used"] == 1
 
 
 class TestCompletedScenariosTracking:
     """Tests for completed scenarios checkpoint system."""
 
     def test_load_completed_scenarios_empty(self):
-        """Test loading completed scenarios when file doesn't exist."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir)
+        """Test loading completed scenarios when none were recorded."""
+        store = InMemoryCompletedStore()
 
-            completed = load_completed_scenarios(output_dir)
-            assert completed == set()
+        completed = load_completed_scenarios(Path("scenarios"), store=store)
+        assert completed == set()
 
     def test_mark_and_load_completed_scenarios(self):
         """Test marking and loading completed scenarios."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir)
+        store = InMemoryCompletedStore()
+        output_dir = Path("scenarios")
 
-            # Mark some scenarios as completed
-            mark_scenario_completed("05_02", output_dir)
-            mark_scenario_completed("10_04", output_dir)
-            mark_scenario_completed("15_06", output_dir)
+        # Mark some scenarios as completed, singly and in one batch
+        mark_scenario_completed("05_02", output_dir, store=store)
+        mark_scenarios_completed(["10_04", "15_06"], output_dir, store=store)
 
-            # Load completed scenarios
-            completed = load_completed_scenarios(output_dir)
-            assert completed == {"05_02", "10_04", "15_06"}
+        # Load completed scenarios
+        completed = load_completed_scenarios(output_dir, store=store)
+        assert completed == {"05_02", "10_04", "15_06"}
+        assert load_completed_scenarios(Path("other"), store=store) == set()
 
-    def test_completed_file_format(self):
-        """Test completed scenarios file format."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir)
+    def test_completed_file_format(self, scenario_tmpdir):
+        """Test completed scenarios file format on disk."""
+        assert load_completed_scenarios(scenario_tmpdir) == set()
 
-            mark_scenario_completed("20_08", output_dir)
+        mark_scenario_completed("20_08", scenario_tmpdir)
+        mark_scenarios_completed(["05_02", "10_04"], scenario_tmpdir)
+        mark_scenarios_completed([], scenario_tmpdir)
 
-            completed_file = output_dir / "completed.txt"
-            assert completed_file.exists()
+        completed_file = scenario_tmpdir / "completed.txt"
+        assert completed_file.read_text() == "20_08\n05_02\n10_04\n"
+        assert load_completed_scenarios(scenario_tmpdir) == {"20_08", "05_02", "10_04"}
 
-            with open(completed_file) as f:
-                content = f.read().strip()
+    def test_load_completed_cached_invalidates_on_mark(self, scenario_tmpdir):
+        """Test cached loads are reused until a new scenario is marked completed."""
+        assert load_completed_scenarios_cached(scenario_tmpdir) == frozenset()
 
-            assert content == "20_08"
+        mark_scenario_completed("05_02", scenario_tmpdir)
+        completed = load_completed_scenarios_cached(scenario_tmpdir)
+        assert completed == {"05_02"}
+        assert load_completed_scenarios_cached(scenario_tmpdir) is completed
+
+        mark_scenario_completed("10_04", scenario_tmpdir)
+        assert load_completed_scenarios_cached(scenario_tmpdir) == {"05_02", "10_04"}
 
 
 class TestScenarioSummaryStats:
     """Tests for scenario summary statistics."""
 
-    def test_get_scenario_summary_stats_empty(self):
+    def test_get_scenario_summary_stats_empty(self, scenario_tmpdir):
         """Test summary stats when no scenarios completed."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir)
-
-            stats = get_scenario_summary_stats(output_dir)
-            assert "message" in stats
-            assert "No scenarios completed" in stats["message"]
-
-    def test_get_scenario_summary_stats(self):
-        """Test summary stats calculation."""
-        # Create test CSV file
-        test_data = pl.DataFrame(
-            {
-                "scenario_id": ["05_02", "10_04", "15_06"],
-                "radius_km": [5, 10, 15],
-                "client_tw_hours": [2, 4, 6],
-                "pharmacies_count": [20, 50, 80],
-                "vehicles_used": [2, 5, 8],
-                "total_distance_km": [100.0, 250.0, 400.0],
-                "total_time_sec": [3600, 7200, 10800],
-                "execution_time_sec": [30.0, 45.0, 60.0],
-                "status": ["OK", "OK", "OK"],
-            }
-        )
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir)
-            csv_file = output_dir / "scenarios.csv"
-            test_data.write_csv(csv_file)
-
-            stats = get_scenario_summary_stats(output_dir)
-
-            assert stats["total_scenarios"] == 3
-            assert stats["successful_scenarios"] == 3
-            assert stats["failed_scenarios"] == 0
-            assert stats["total_pharmacies"] == 150  # 20 + 50 + 80
-            assert stats["total_distance_km"] == 750.0  # 100 + 250 + 400
-            assert stats["total_vehicles_used"] == 15  # 2 + 5 + 8
-            assert stats["min_vehicles"] == 2
-            assert stats["max_vehicles"] == 8
-            assert stats["radius_range"] == "5-15 km"
+        stats = get_scenario_summary_stats(scenario_tmpdir)
+        assert "message" in stats
+        assert "No scenarios completed" in stats["message"]
+
+    def test_get_scenario_summary_stats(self, scenario_tmpdir):
+        """Test summary stats calculation from scenarios.csv."""
+        _SUCCESS_DF.write_csv(scenario_tmpdir / "scenarios.csv")
+
+        stats = get_scenario_summary_stats(scenario_tmpdir)
+
+        assert stats["total_scenarios"] == 3
+        assert stats["successful_scenarios"] == 3
+        assert stats["failed_scenarios"] == 0
+        assert stats["total_pharmacies"] == 150  # 20 + 50 + 80
+        assert stats["total_distance_km"] == 750.0  # 100 + 250 + 400
+        assert stats["total_vehicles_used"] == 15  # 2 + 5 + 8
+        assert stats["min_vehicles"] == 2
+        assert stats["max_vehicles"] == 8
+        assert stats["radius_range"] == "5-15 km"
 
     def test_get_scenario_summary_stats_with_failures(self):
         """Test summary stats with failed scenarios."""
-        test_data = pl.DataFrame(
-            {
-                "scenario_id": ["05_02", "10_04"],
-                "radius_km": [5, 10],
-                "client_tw_hours": [2, 4],
-                "pharmacies_count": [20, 50],
-                "vehicles_used": [2, 0],  # Second scenario failed
-                "total_distance_km": [100.0, 0.0],
-                "total_time_sec": [3600, 0],
-                "execution_time_sec": [30.0, 15.0],
-                "status": ["OK", "INFEASIBLE"],
-            }
-        )
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_dir = Path(tmpdir)
-            csv_file = output_dir / "scenarios.csv"
-            test_data.write_csv(csv_file)
-
-            stats = get_scenario_summary_stats(output_dir)
-
-            assert stats["total_scenarios"] == 2
-            assert stats["successful_scenarios"] == 1
-            assert stats["failed_scenarios"] == 1
-            # Should only count successful scenarios in distance/vehicle stats
-            assert stats["total_distance_km"] == 100.0
-            assert stats["total_vehicles_used"] == 2
+        stats = get_scenario_summary_stats_from_df(_MIXED_DF)
+
+        assert stats["total_scenarios"] == 2
+        assert stats["successful_scenarios"] == 1
+        assert stats["failed_scenarios"] == 1
+        # Should only count successful scenarios in distance/vehicle stats
+        assert stats["total_distance_km"] == 100.0
+        assert stats["total_vehicles_used"] == 2
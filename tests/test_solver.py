@@ -1,11 +1,12 @@
 """Tests for VRPTW solver."""
 
-from unittest.mock import MagicMock, patch
-
 import pytest
 
 from src.vrptw.solver import VRPResult, _require_ortools
 
+# Stand-in for an installed OR-Tools module; _require_ortools only checks for None
+_SENTINEL = object()
+
 
 class TestVRPResult:
     """Tests for VRPResult data container."""
@@ -30,16 +31,18 @@ class TestVRPResult:
 class TestORToolsRequirement:
     """Tests for OR-Tools requirement checking."""
 
-    @patch("src.vrptw.solver.pywrapcp", None)
-    @patch("src.vrptw.solver.routing_enums_pb2", None)
-    def test_require_ortools_missing(self):
+    def test_require_ortools_missing(self, monkeypatch):
         """Test OR-Tools requirement when not available."""
+        monkeypatch.setattr("src.vrptw.solver.pywrapcp", None)
+        monkeypatch.setattr("src.vrptw.solver.routing_enums_pb2", None)
+
         with pytest.raises(ImportError, match="OR-Tools not available"):
             _require_ortools()
 
-    @patch("src.vrptw.solver.pywrapcp", MagicMock())
-    @patch("src.vrptw.solver.routing_enums_pb2", MagicMock())
-    def test_require_ortools_available(self):
+    def test_require_ortools_available(self, monkeypatch):
         """Test OR-Tools requirement when available."""
+        monkeypatch.setattr("src.vrptw.solver.pywrapcp", _SENTINEL)
+        monkeypatch.setattr("src.vrptw.solver.routing_enums_pb2", _SENTINEL)
+
         # Should not raise
         _require_ortools()